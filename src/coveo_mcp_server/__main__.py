@@ -1,7 +1,11 @@
 import os
 import uvicorn
+from dotenv import load_dotenv
 from coveo_mcp_server.server import mcp
 
+# Credentials are read lazily on the first Coveo call, so loading them here is enough
+load_dotenv()
+
 if __name__ == "__main__":
     # Check for transport type from environment variable
     use_stdio = os.getenv("USE_STDIO", "false").lower() == "true"
@@ -1,27 +1,99 @@
 import os
-from typing import Any, Dict, Optional, List
+import logging
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Optional, List
 import httpx
-import json
-from dotenv import load_dotenv
+import ijson
+import orjson
 from dataclasses import dataclass, field
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
 # Coveo API constants
 COVEO_SEARCH_API_ENDPOINT = "https://{org_id}.org.coveo.com/rest/search/v3?organizationId={org_id}"
 COVEO_PASSAGES_API_ENDPOINT = "https://{org_id}.org.coveo.com/rest/search/v3/passages/retrieve?organizationId={org_id}"
 COVEO_ANSWER_API_ENDPOINT = "https://{org_id}.org.coveo.com/rest/organizations/{org_id}/answer/v1/configs/{config_id}/generate"
-API_KEY = os.getenv("COVEO_API_KEY")
-ORG_ID = os.getenv("COVEO_ORGANIZATION_ID")
-ANSWER_CONFIG_ID = os.getenv("COVEO_ANSWER_CONFIG_ID", "default")
 USER_AGENT = "coveo-mcp-server/1.0"
+MAX_RESPONSE_BYTES = 10 * 1024 * 1024
+
+# SSE framing, matched against the raw byte stream
+_SSE_DATA_PREFIX = b"data:"
+_SSE_EVENT_SEPARATOR = b"\n\n"
+
+
+class _PayloadType:
+    """Answer API stream frame types, as dotted names usable as match patterns."""
+    MESSAGE = "genqa.messageType"
+    CITATIONS = "genqa.citationsType"
+    END_OF_STREAM = "genqa.endOfStreamType"
+
+@dataclass
+class CoveoConfig:
+    """Coveo credentials, with the endpoint URLs and request headers derived from them."""
+    api_key: str
+    organization_id: str
+    answer_config_id: str = "default"
+    search_url: str = field(init=False)
+    passages_url: str = field(init=False)
+    answer_url: str = field(init=False)
+    is_oauth_token: bool = field(init=False)
+    headers: Dict[str, str] = field(init=False)
+    passage_headers: Dict[str, str] = field(init=False)
+    answer_headers: Dict[str, str] = field(init=False)
+
+    def __post_init__(self):
+        self.search_url = COVEO_SEARCH_API_ENDPOINT.format(org_id=self.organization_id)
+        # Already carries organizationId as a query parameter, as OAuth tokens require
+        self.passages_url = COVEO_PASSAGES_API_ENDPOINT.format(org_id=self.organization_id)
+        self.answer_url = COVEO_ANSWER_API_ENDPOINT.format(org_id=self.organization_id, config_id=self.answer_config_id)
+
+        # OAuth tokens start with a single 'x'; API keys pass the organization in a header instead
+        self.is_oauth_token = self.api_key[:1] == 'x' and self.api_key[:2] != 'xx'
+
+        self.headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        self.passage_headers = {
+            **self.headers,
+            "accept": "application/json"
+        }
+        if not self.is_oauth_token:
+            self.passage_headers["organizationId"] = self.organization_id
+        self.answer_headers = {
+            **self.headers,
+            "Accept": "application/json, text/event-stream",
+            "Accept-Language": "en-US"
+        }
+
+
+@lru_cache(maxsize=1)
+def get_config() -> CoveoConfig:
+    """
+    Read the Coveo configuration from the environment on first use.
+    
+    Returns:
+        CoveoConfig: The configuration, cached for the lifetime of the process.
+        
+    Raises:
+        RuntimeError: If the API key or organization ID is not set.
+    """
+    try:
+        return CoveoConfig(
+            api_key=os.environ["COVEO_API_KEY"],
+            organization_id=os.environ["COVEO_ORGANIZATION_ID"],
+            answer_config_id=os.environ.get("COVEO_ANSWER_CONFIG_ID", "default")
+        )
+    except KeyError as e:
+        raise RuntimeError(f"Missing required environment variable: {e.args[0]}") from e
+
+# Shared HTTP/2 client, so concurrent tool calls are multiplexed over pooled keep-alive connections
+_client: Optional[httpx.AsyncClient] = None
 
 @dataclass
 class SearchContext:
     """Search context for Coveo queries."""
     q: str
-    bearer_token: str = field(default_factory=lambda: API_KEY)
-    organization_id: str = field(default_factory=lambda: ORG_ID)
     filter: Optional[str] = None
     locale: str = "en-US"
     timezone: str = "America/New_York"
@@ -29,6 +101,37 @@ class SearchContext:
     additionalFields: Optional[List[str]] = None
 
 
+def get_client() -> httpx.AsyncClient:
+    """
+    Return the shared HTTP client used for all Coveo API calls, creating it on first use.
+    
+    Returns:
+        httpx.AsyncClient: The shared client.
+    """
+    global _client
+    if _client is None:
+        # Pool sizes can be raised for high-throughput deployments
+        limits = httpx.Limits(
+            max_keepalive_connections=int(os.getenv("COVEO_HTTP_MAX_KEEPALIVE_CONNECTIONS", "20")),
+            max_connections=int(os.getenv("COVEO_HTTP_MAX_CONNECTIONS", "100")),
+            keepalive_expiry=60.0
+        )
+        _client = httpx.AsyncClient(
+            limits=limits,
+            http2=True,
+            timeout=httpx.Timeout(30.0),
+            headers={"User-Agent": USER_AGENT}
+        )
+    return _client
+
+async def aclose_client() -> None:
+    """Close the shared HTTP client, if it was created."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
 def format_search_response(response: Dict[str, Any], fields_to_include: List[str]) -> Dict[str, Any]:
     """
     Format the Coveo search response to include only specified fields.
@@ -50,54 +153,104 @@ def format_search_response(response: Dict[str, Any], fields_to_include: List[str
     
     return {"results": formatted_results}
 
-def format_passage_retrieval_response(response: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def format_passage(item: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Format the Coveo passage retrieval response to extract relevant passages.
+    Format a single Coveo passage item, keeping only its text and document.
     
     Args:
-        response (List[Dict[str, Any]]): The raw list of passage items.
+        item (Dict[str, Any]): The raw passage item.
         
     Returns:
-        List[Dict[str, Any]]: List of formatted passages without relevanceScore.
+        Dict[str, Any]: The formatted passage.
     """
-    if not response:
-        return []
+    return {
+        "text": item.get("text", ""),
+        "document": item.get("document", {})
+    }
+
+def _extract_event_data(event: bytes) -> bytes:
+    """
+    Extract the data payload from a single server-sent event.
     
-    formatted_passages = []
-    for item in response:
-        passage = {
-            "text": item.get("text", ""),
-            "document": item.get("document", {})
-        }
-        formatted_passages.append(passage)
+    Args:
+        event (bytes): The raw event with '\n' line endings, without its trailing blank line.
+        
+    Returns:
+        bytes: The event's data lines joined with newlines, or empty bytes if it has none.
+    """
+    # A single prefix check skips blank lines, comments (starting with ':') and other fields
+    prefix_length = len(_SSE_DATA_PREFIX)
+    return b"\n".join(line[prefix_length:] for line in event.split(b"\n") if line.startswith(_SSE_DATA_PREFIX))
+
+async def iter_sse_data(response: httpx.Response) -> AsyncIterator[bytes]:
+    """
+    Yield the data payload of each server-sent event in a streaming response.
     
-    return formatted_passages
+    Chunks are accumulated in a byte buffer and split on blank-line event boundaries,
+    so events split across network reads are reassembled before being yielded.
+    CRLF and CR line endings are normalized to LF as they are buffered.
+    
+    Args:
+        response (httpx.Response): The streaming response.
+        
+    Yields:
+        bytes: The data payload of each event that has one.
+    """
+    buffer = bytearray()
+    pending_cr = False
+    async for chunk in response.aiter_bytes(chunk_size=8192):
+        # Hold back a trailing '\r' until the next chunk shows whether it starts a CRLF pair
+        if pending_cr:
+            chunk = b"\r" + chunk
+        pending_cr = chunk.endswith(b"\r")
+        if pending_cr:
+            chunk = chunk[:-1]
+        if b"\r" in chunk:
+            chunk = chunk.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+        # Bytes already buffered were scanned before, so only a separator starting on
+        # the last of them or inside the new chunk can be found
+        start = max(0, len(buffer) - len(_SSE_EVENT_SEPARATOR) + 1)
+        buffer.extend(chunk)
+        while (index := buffer.find(_SSE_EVENT_SEPARATOR, start)) != -1:
+            data = _extract_event_data(buffer[:index])
+            del buffer[:index + len(_SSE_EVENT_SEPARATOR)]
+            start = 0
+            if data:
+                yield data
+    
+    # The stream may end without a blank line after its last event
+    if pending_cr:
+        buffer.extend(b"\n")
+    data = _extract_event_data(buffer)
+    if data:
+        yield data
 
 async def make_coveo_request(payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """Make a request to the Coveo API with proper error handling."""
-    headers = {
-        "Authorization": f"Bearer {API_KEY}",
-        "Content-Type": "application/json",
-        "User-Agent": USER_AGENT
-    }
+    try:
+        client = get_client()
+        config = get_config()
+        async with client.stream('POST', config.search_url, headers=config.headers, json=payload) as response:
+            if response.is_error:
+                # Read the error body while the stream is still open
+                await response.aread()
+            response.raise_for_status()
 
-    params = {}
-    params["organizationId"] = ORG_ID
+            # Stop reading oversized responses instead of buffering them whole
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body.extend(chunk)
+                if len(body) > MAX_RESPONSE_BYTES:
+                    return {"error": f"Response too large: exceeds {MAX_RESPONSE_BYTES} bytes"}
 
-    endpoint = COVEO_SEARCH_API_ENDPOINT.format(
-        org_id=ORG_ID
-    )
-    
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(endpoint, headers=headers, json=payload, params=params, timeout=30.0)
-            response.raise_for_status()
-            formatted_response = format_search_response(response.json(), payload.get("fieldsToInclude", []))
-            return formatted_response
-        except httpx.HTTPStatusError as e:
-            return {"error": f"HTTP {e.response.status_code}: {e.response.text}"}
-        except Exception as e:
-            return {"error": f"Request failed: {str(e)}"}
+        # Decode straight from the raw bytes, without an intermediate text copy
+        formatted_response = format_search_response(orjson.loads(body), payload.get("fieldsToInclude", []))
+        return formatted_response
+    except httpx.HTTPStatusError as e:
+        return {"error": f"HTTP {e.response.status_code}: {e.response.text}"}
+    except Exception as e:
+        return {"error": f"Request failed: {str(e)}"}
 
 async def retrieve_passages(query: str, number_of_passages: int = 5) -> Dict:
     """
@@ -111,26 +264,6 @@ async def retrieve_passages(query: str, number_of_passages: int = 5) -> Dict:
         List[Passage]: List of retrieved passages.
     """
     search_context = SearchContext(q=query)
-    endpoint = COVEO_PASSAGES_API_ENDPOINT.format(
-        org_id=ORG_ID
-    )
-    
-    is_oauth_token = search_context.bearer_token.startswith('x') and not search_context.bearer_token.startswith('xx')
-
-    headers = {
-        'Authorization': f'Bearer {search_context.bearer_token}',
-        'Content-Type': 'application/json',
-        'accept': 'application/json'
-    }
-    
-    # Add organizationId in headers if using API Key
-    if not is_oauth_token:
-        headers['organizationId'] = search_context.organization_id
-
-    # Only add organizationId as query parameter for OAuth tokens
-    params = {}
-    if is_oauth_token:
-        params['organizationId'] = search_context.organization_id
 
     payload = {
         "query": search_context.q,
@@ -144,49 +277,43 @@ async def retrieve_passages(query: str, number_of_passages: int = 5) -> Dict:
         "additionalFields": search_context.additionalFields or [],
     }
     
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(endpoint, headers=headers, json=payload, params=params, timeout=30.0)
+    try:
+        client = get_client()
+        config = get_config()
+        async with client.stream('POST', config.passages_url, headers=config.passage_headers, json=payload) as response:
+            if response.is_error:
+                # Read the error body while the stream is still open
+                await response.aread()
             response.raise_for_status()
-            data = response.json()
 
-            formatted_passages = format_passage_retrieval_response(data.get('items', []))
-            
-            return formatted_passages
-            
-        except httpx.HTTPStatusError as e:
-            print(f"HTTP {e.response.status_code}: {e.response.text}")
-            return []
-        except Exception as e:
-            print(f"Error retrieving passages: {str(e)}")
-            return []
+            # Parse items incrementally so the raw body is never buffered whole
+            items = ijson.items_async(ijson.from_iter(response.aiter_bytes()), 'items.item', use_float=True)
+            formatted_passages = [format_passage(item) async for item in items]
+        
+        return formatted_passages
+        
+    except httpx.HTTPStatusError as e:
+        logger.warning("HTTP %s: %s", e.response.status_code, e.response.text)
+        return []
+    except Exception as e:
+        logger.warning("Error retrieving passages: %s", e)
+        return []
 
-async def generate_answer(query: str) -> str:
+async def generate_answer(query: str) -> AsyncIterator[str]:
     """
     Generates an answer using Coveo Answer API's streaming endpoint.
     
     Args:
         query (str): The question to answer.
         
-    Returns:
-        str: The generated answer or error message.
+    Yields:
+        str: Each chunk of the answer as it is generated, followed by the citations,
+        or an error message.
     """
-    if not query:
-        return "Error: Query cannot be empty"
-    
-    # Format the endpoint URL with organization ID and config ID
-    endpoint = COVEO_ANSWER_API_ENDPOINT.format(
-        org_id=ORG_ID,
-        config_id=ANSWER_CONFIG_ID
-    )
-    
-    headers = {
-        'Authorization': f'Bearer {API_KEY}',
-        'Content-Type': 'application/json',
-        'Accept': 'application/json, text/event-stream',
-        'Accept-Language': 'en-US',
-        'User-Agent': USER_AGENT,
-    }
+    # Reject blank queries before touching the configuration or the HTTP client
+    if not query.strip():
+        yield "Error: Query cannot be empty"
+        return
     
     payload = {
         'q': query,
@@ -201,58 +328,47 @@ async def generate_answer(query: str) -> str:
     }
     
     try:
-        complete_answer = []
         citations = []
         
-        async with httpx.AsyncClient() as client:
-            async with client.stream('POST', endpoint, headers=headers, json=payload, timeout=60.0) as response:
-                response.raise_for_status()
-                
-                async for line in response.aiter_lines():
-                    if not line.strip() or not line.startswith('data:'):
-                        continue
+        client = get_client()
+        config = get_config()
+        async with client.stream('POST', config.answer_url, headers=config.answer_headers, json=payload, timeout=60.0) as response:
+            if response.is_error:
+                # Read the error body while the stream is still open
+                await response.aread()
+            response.raise_for_status()
+            
+            async for json_data in iter_sse_data(response):
+                try:
+                    data = orjson.loads(json_data)
                     
-                    # Extract the JSON data part
-                    json_data = line.replace('data:', '').strip()
-                    try:
-                        data = json.loads(json_data)
-                        payload_type = data.get('payloadType')
-                        
-                        # Process different types of responses
-                        if payload_type == 'genqa.messageType':
-                            payload = json.loads(data.get('payload', '{}'))
-                            text_delta = payload.get('textDelta', '')
+                    # Dispatch on the frame type; the inner payload is only decoded when it is used
+                    match data.get('payloadType'):
+                        case _PayloadType.MESSAGE:
+                            text_delta = orjson.loads(data.get('payload', '{}')).get('textDelta', '')
                             if text_delta:
-                                complete_answer.append(text_delta)
+                                yield text_delta
                         
                         # Extract citations if available
-                        elif payload_type == 'genqa.citationsType':
-                            payload = json.loads(data.get('payload', '{}'))
-                            citations = payload.get('citations', [])
+                        case _PayloadType.CITATIONS:
+                            citations = orjson.loads(data.get('payload', '{}')).get('citations', [])
                         
                         # Check for end of stream or errors
-                        elif payload_type == 'genqa.endOfStreamType':
+                        case _PayloadType.END_OF_STREAM:
                             break
-                        
-                    except Exception as e:
-                        print(f"Error parsing stream data: {str(e)}")
-        
-        # Combine answer parts
-        answer_text = ''.join(complete_answer)
-        
+                    
+                except Exception as e:
+                    logger.debug("Error parsing stream data: %s", e)
+    
         # Format citations if available
         if citations:
-            citation_text = "\n\n**Sources:**\n"
-            for i, citation in enumerate(citations):
-                title = citation.get('title', 'Untitled')
-                click_uri = citation.get('clickUri', '#')
-                citation_text += f"{i+1}. [{title}]({click_uri})\n"
-            
-            answer_text += citation_text
-        
-        return answer_text
+            citation_lines = (
+                f"{i+1}. [{citation.get('title', 'Untitled')}]({citation.get('clickUri', '#')})"
+                for i, citation in enumerate(citations)
+            )
+            yield "\n\n**Sources:**\n" + "\n".join(citation_lines) + "\n"
     
     except httpx.HTTPStatusError as e:
-        return f"Error: HTTP {e.response.status_code}: {e.response.text}"
+        yield f"Error: HTTP {e.response.status_code}: {e.response.text}"
     except Exception as e:
-        return f"Error generating answer: {str(e)}"
+        yield f"Error generating answer: {str(e)}"
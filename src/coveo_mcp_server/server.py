@@ -1,15 +1,59 @@
-import json
-from typing import Any, Dict
-from dotenv import load_dotenv
-from mcp.server.fastmcp import FastMCP
-from coveo_mcp_server.coveo_api import make_coveo_request, retrieve_passages, generate_answer
+import os
+import orjson
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+from cachetools import TTLCache
+from mcp.server.fastmcp import Context, FastMCP
+from coveo_mcp_server.coveo_api import aclose_client, make_coveo_request, retrieve_passages, generate_answer
 
-load_dotenv()
+# Number of MCP sessions currently running; the HTTP transports run the lifespan once per session
+_active_sessions = 0
+
+
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Close the shared Coveo HTTP client once the last MCP session ends."""
+    global _active_sessions
+    _active_sessions += 1
+    try:
+        yield
+    finally:
+        _active_sessions -= 1
+        if _active_sessions == 0:
+            await aclose_client()
+
+
+mcp = FastMCP("coveo_mcp_server", lifespan=lifespan)
+
+# Results of repeated queries are served from memory for a few minutes.
+# Keys only include the tool arguments, so changing credentials requires a restart.
+_search_cache: TTLCache = TTLCache(maxsize=256, ttl=300)
+_passage_cache: TTLCache = TTLCache(maxsize=256, ttl=300)
+
+# Parts of the search payload that are the same for every query
+_SEARCH_PAYLOAD_BASE: Dict[str, Any] = {
+    "fieldsToExclude": [
+        "rankingInfo"
+    ],
+    "fieldsToInclude": [
+        "title",
+        "uri",
+        "excerpt",
+        "printableUri",
+        "clickUri"
+    ],
+    "excerptLength": 500,
+    "debugRankingInformation": False
+}
+
+
+def _cache_enabled() -> bool:
+    """Return whether tool results may be cached, unless disabled with COVEO_DISABLE_CACHE=1."""
+    return os.getenv("COVEO_DISABLE_CACHE", "0") != "1"
 
-mcp = FastMCP("coveo_mcp_server")
 
 @mcp.tool()
-async def search_coveo(query: str, numberOfResults: int = 5) -> Dict[str, Any]:
+async def search_coveo(query: str, numberOfResults: int = 5) -> str:
     """
     Use search_coveo when the goal is to retrieve metadata, titles, or URLs related to documents.
     Ideal for exploring information broadly, navigating multiple sources, or presenting lists of content without needing the content itself.
@@ -24,35 +68,30 @@ async def search_coveo(query: str, numberOfResults: int = 5) -> Dict[str, Any]:
 
         str: JSON Formatted search results or an error message.
     """
+    cache_key = (query, numberOfResults)
+    # A single lookup, so an entry expiring between check and read cannot raise KeyError
+    cached = _search_cache.get(cache_key) if _cache_enabled() else None
+    if cached is not None:
+        return cached
 
-    payload = {
-        "q": query,
-        "numberOfResults": numberOfResults,
-        "fieldsToExclude": [
-            "rankingInfo"
-        ],
-        "fieldsToInclude": [
-            "title",
-            "uri",
-            "excerpt",
-            "printableUri",
-            "clickUri"
-        ],
-        "excerptLength": 500,
-        "debugRankingInformation": False
-    }
+    payload = _SEARCH_PAYLOAD_BASE.copy()
+    payload["q"] = query
+    payload["numberOfResults"] = numberOfResults
 
     data = await make_coveo_request(payload)
     
     if data and "error" not in data:
         if "results" in data and data["results"]:
-            return  json.dumps(data["results"])
+            results = orjson.dumps(data["results"]).decode()
+            if _cache_enabled():
+                _search_cache[cache_key] = results
+            return results
         return "No results found for this query."
     return f"Error: {data.get('error', 'Unknown error occurred')}"
 
 
 @mcp.tool()
-async def passage_retrieval(query: str, numberOfPassages: int = 5) -> Dict[str, Any]:
+async def passage_retrieval(query: str, numberOfPassages: int = 5) -> str:
     """
     Use passage_retrieval to extract highly relevant text snippets from documents.
     Useful when building answers, summaries, or even new documents from source material.
@@ -66,26 +105,35 @@ async def passage_retrieval(query: str, numberOfPassages: int = 5) -> Dict[str,
     Returns:
         str: JSON Formatted passages or error message.
     """
-    if not query:
+    if not query.strip():
         return "Error: Query cannot be empty"
     
+    cache_key = (query, numberOfPassages)
+    cached = _passage_cache.get(cache_key) if _cache_enabled() else None
+    if cached is not None:
+        return cached
+    
     try:
         passages = await retrieve_passages(query=query, number_of_passages=numberOfPassages)
         
         if not passages:
             return "No passages found for this query."
         
-        return json.dumps(passages)
+        result = orjson.dumps(passages).decode()
+        if _cache_enabled():
+            _passage_cache[cache_key] = result
+        return result
     except Exception as e:
         return f"Error retrieving passages: {str(e)}"
 
 
 @mcp.tool()
-async def answer_question(query: str) -> str:
+async def answer_question(query: str, ctx: Context) -> str:
     """
     Use answer_question when the query requires a complete, consistent, and well-structured answer.
     This tool uses a prompt-engineered LLM, combining passages and documents, with safeguards to reduce hallucinations, ensure factual accuracy, and enforce security constraints.
     Designed for delivering clear, direct answers that are ready to consume.
+    The answer is streamed to the client as progress notifications while it is generated.
     
     Args:
         query (str): The question to answer.
@@ -93,10 +141,14 @@ async def answer_question(query: str) -> str:
     Returns:
         str: The generated answer with citations or error message.
     """
-    if not query:
+    if not query.strip():
         return "Error: Query cannot be empty"
     
     try:
-        return await generate_answer(query)
+        answer_parts = []
+        async for chunk in generate_answer(query):
+            answer_parts.append(chunk)
+            await ctx.report_progress(len(answer_parts), message=chunk)
+        return ''.join(answer_parts)
     except Exception as e:
         return f"Error generating answer: {str(e)}"
\ No newline at end of file
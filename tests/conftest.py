@@ -0,0 +1,30 @@
+import pytest
+import respx
+
+from coveo_mcp_server.coveo_api import aclose_client, get_config
+
+
+@pytest.fixture(scope="session", autouse=True)
+def mock_env_vars():
+    """Fixture to mock environment variables once for the whole test session."""
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("COVEO_API_KEY", "mock-api-key")
+        monkeypatch.setenv("COVEO_ORGANIZATION_ID", "mock-org-id")
+        monkeypatch.setenv("COVEO_ANSWER_CONFIG_ID", "mock-config-id")
+        get_config.cache_clear()
+        yield
+    get_config.cache_clear()
+
+
+@pytest.fixture(scope="session", autouse=True)
+async def shared_client():
+    """Fixture to close the shared Coveo client once the test session ends."""
+    yield
+    await aclose_client()
+
+
+@pytest.fixture
+def coveo_api():
+    """Fixture routing the running test's Coveo API calls to respx mocks instead of the network."""
+    with respx.mock(base_url="https://mock-org-id.org.coveo.com") as router:
+        yield router
@@ -1,31 +1,53 @@
-import unittest
-from unittest.mock import patch, AsyncMock, MagicMock
+import asyncio
+from unittest.mock import patch
 import json
 import os
-from typing import Dict, Any
 
-import pytest
+import hpack
+import httpcore
 import httpx
+import hyperframe.frame
+import orjson
 
 from coveo_mcp_server.coveo_api import (
     make_coveo_request,
     format_search_response,
-    format_passage_retrieval_response,
     retrieve_passages,
     generate_answer,
-    SearchContext
+    iter_sse_data,
+    get_client,
+    aclose_client,
+    get_config
 )
 
 
-@pytest.fixture(autouse=True)
-def mock_env_vars():
-    """Fixture to mock environment variables for all tests."""
-    with patch.dict(os.environ, {
-        "COVEO_API_KEY": "mock-api-key",
-        "COVEO_ORGANIZATION_ID": "mock-org-id",
-        "COVEO_ANSWER_CONFIG_ID": "mock-config-id"
-    }):
-        yield
+def _sse_event(payload_type: str, payload: str) -> bytes:
+    """Encode one Answer API frame as a server-sent event."""
+    return b"data:" + orjson.dumps({"payloadType": payload_type, "payload": payload}) + b"\n\n"
+
+
+# Answer stream shared by the generate_answer tests, encoded once at import time
+_ANSWER_SSE_BODY = b"".join([
+    _sse_event("genqa.messageType", orjson.dumps({"textDelta": "This is "}).decode()),
+    _sse_event("genqa.messageType", orjson.dumps({"textDelta": "a test answer"}).decode()),
+    _sse_event("genqa.citationsType", orjson.dumps({
+        "citations": [{"title": "Citation Title", "clickUri": "https://example.com/citation"}]
+    }).decode()),
+    _sse_event("genqa.endOfStreamType", "not json"),
+    _sse_event("genqa.messageType", orjson.dumps({"textDelta": "after end of stream"}).decode()),
+])
+
+SEARCH_PATH = "/rest/search/v3"
+PASSAGES_PATH = "/rest/search/v3/passages/retrieve"
+ANSWER_PATH = "/rest/organizations/mock-org-id/answer/v1/configs/mock-config-id/generate"
+
+
+def _streamed(body: bytes, status_code: int = 200) -> httpx.Response:
+    """Build a response that streams its body in small chunks, so parsers see split reads."""
+    async def chunks():
+        for i in range(0, len(body), 16):
+            yield body[i:i + 16]
+    return httpx.Response(status_code, content=chunks())
 
 
 def test_format_search_response():
@@ -63,80 +85,173 @@ def test_format_search_response():
     assert formatted == {"results": []}
 
 
-@pytest.mark.asyncio
-async def test_make_coveo_request_success():
+def test_get_config_from_env():
+    """Test that the configuration is read from the environment and cached."""
+    config = get_config()
+
+    assert config.api_key == "mock-api-key"
+    assert config.answer_url == "https://mock-org-id.org.coveo.com/rest/organizations/mock-org-id/answer/v1/configs/mock-config-id/generate"
+    assert config.headers["Authorization"] == "Bearer mock-api-key"
+    assert not config.is_oauth_token
+    assert get_config() is config
+
+
+async def test_missing_credentials():
+    """Test that missing credentials are reported as a request error."""
+    get_config.cache_clear()
+    with patch.dict(os.environ, clear=True):
+        result = await make_coveo_request({"q": "test query"})
+
+    assert "COVEO_API_KEY" in result["error"]
+
+
+async def test_invalid_pool_limits_reported_as_errors(caplog):
+    """Test that a malformed pool size is reported like any other request failure."""
+    with patch('coveo_mcp_server.coveo_api._client', None), \
+         patch.dict(os.environ, {"COVEO_HTTP_MAX_CONNECTIONS": "many"}):
+        search = await make_coveo_request({"q": "test query"})
+        passages = await retrieve_passages("test query")
+        answer = "".join([chunk async for chunk in generate_answer("test question")])
+
+    assert "invalid literal for int()" in search["error"]
+    assert passages == []
+    assert "invalid literal for int()" in caplog.text
+    assert answer.startswith("Error generating answer:")
+
+
+async def test_get_client_reuses_shared_client():
+    """Test that the shared client is created once and reset on close."""
+    with patch('coveo_mcp_server.coveo_api._client', None):
+        client = get_client()
+        assert get_client() is client
+
+        await aclose_client()
+        assert client.is_closed
+        assert get_client() is not client
+        await aclose_client()
+
+
+def test_get_client_pool_limits_from_env():
+    """Test that the connection pool size can be configured from the environment."""
+    with patch('coveo_mcp_server.coveo_api._client', None), \
+         patch.dict(os.environ, {"COVEO_HTTP_MAX_CONNECTIONS": "200", "COVEO_HTTP_MAX_KEEPALIVE_CONNECTIONS": "50"}), \
+         patch('httpx.AsyncClient') as mock_client_class:
+        get_client()
+
+        limits = mock_client_class.call_args.kwargs["limits"]
+        assert limits.max_connections == 200
+        assert limits.max_keepalive_connections == 50
+
+
+async def test_get_client_enables_http2():
+    """Test that the shared client's connection pool negotiates HTTP/2."""
+    with patch('coveo_mcp_server.coveo_api._client', None):
+        client = get_client()
+        try:
+            pool = client._transport._pool
+            assert pool._http2 is True
+            assert pool._max_connections == 100
+        finally:
+            await aclose_client()
+
+
+class CountingMockBackend(httpcore.AsyncMockBackend):
+    """In-memory network backend that replays canned HTTP/2 frames and counts opened connections."""
+    def __init__(self, buffer, http2=False):
+        super().__init__(buffer, http2=http2)
+        self.connections = 0
+
+    async def connect_tcp(self, *args, **kwargs):
+        self.connections += 1
+        return await super().connect_tcp(*args, **kwargs)
+
+
+async def test_concurrent_requests_share_one_http2_connection():
+    """Test that concurrent requests are multiplexed as HTTP/2 streams over a single pooled connection."""
+    encoder = hpack.Encoder()
+    body = orjson.dumps({"results": []})
+    frames = [hyperframe.frame.SettingsFrame().serialize()]
+    # Client-initiated streams use odd ids, in the order the requests are sent
+    for stream_id in range(1, 20, 2):
+        frames.append(hyperframe.frame.HeadersFrame(
+            stream_id,
+            encoder.encode([(b":status", b"200"), (b"content-type", b"application/json")]),
+            flags=["END_HEADERS"]
+        ).serialize())
+        frames.append(hyperframe.frame.DataFrame(stream_id, body, flags=["END_STREAM"]).serialize())
+    backend = CountingMockBackend(frames, http2=True)
+
+    with patch('coveo_mcp_server.coveo_api._client', None):
+        client = get_client()
+        client._transport._pool._network_backend = backend
+        try:
+            results = await asyncio.gather(*(make_coveo_request({"q": f"query {i}"}) for i in range(10)))
+        finally:
+            await aclose_client()
+
+    assert results == [{"results": []}] * 10
+    assert backend.connections == 1
+
+
+async def test_make_coveo_request_success(coveo_api):
     """Test successful Coveo API request."""
-    # Setup mock response
-    mock_response = MagicMock()
-    mock_response.raise_for_status = MagicMock()
-    mock_response.json.return_value = {"results": [{"title": "Test Result"}]}
+    route = coveo_api.post(SEARCH_PATH).mock(
+        side_effect=lambda request: _streamed(orjson.dumps({"results": [{"title": "Test Result", "score": 1234}]}))
+    )
     
-    # Mock the AsyncClient as context manager
-    mock_client = AsyncMock()
-    mock_client.post = AsyncMock(return_value=mock_response)
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=None)
+    # Call function
+    params = {"q": "test query", "numberOfResults": 5, "fieldsToInclude": ["title"]}
+    result = await make_coveo_request(params)
     
-    with patch('httpx.AsyncClient', return_value=mock_client):
-        # Call function
-        params = {"q": "test query", "numberOfResults": 5, "fieldsToInclude": ["title"]}
-        result = await make_coveo_request(params)
+    # Verify result
+    expected = {"results": [{"title": "Test Result"}]}
+    assert result == expected
+
+    # Verify the payload is sent as a JSON body, not as extra query parameters
+    assert route.call_count == 1
+    request = route.calls.last.request
+    assert str(request.url) == "https://mock-org-id.org.coveo.com/rest/search/v3?organizationId=mock-org-id"
+    assert orjson.loads(request.content) == params
+
+
+async def test_make_coveo_request_too_large(coveo_api):
+    """Test that oversized responses are rejected instead of buffered."""
+    coveo_api.post(SEARCH_PATH).mock(side_effect=lambda request: _streamed(orjson.dumps({"results": [{"title": "x" * 100}]})))
+    
+    with patch('coveo_mcp_server.coveo_api.MAX_RESPONSE_BYTES', 64):
+        result = await make_coveo_request({"q": "test query"})
         
-        # Verify result
-        expected = {"results": [{"title": "Test Result"}]}
-        assert result == expected
+    assert "Response too large" in result["error"]
 
 
-@pytest.mark.asyncio
-async def test_make_coveo_request_http_error():
+async def test_make_coveo_request_http_error(coveo_api):
     """Test Coveo API request with HTTP error."""
-    # Setup mock response that raises HTTP error
-    mock_response = MagicMock()
-    mock_response.raise_for_status.side_effect = httpx.HTTPStatusError(
-        "HTTP Error", request=MagicMock(), response=MagicMock()
-    )
+    coveo_api.post(SEARCH_PATH).mock(side_effect=lambda request: _streamed(b"Bad Request", status_code=400))
     
-    # Mock the AsyncClient as context manager
-    mock_client = AsyncMock()
-    mock_client.post = AsyncMock(return_value=mock_response)
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=None)
+    # Call function
+    params = {"q": "test query"}
+    result = await make_coveo_request(params)
     
-    with patch('httpx.AsyncClient', return_value=mock_client):
-        # Call function
-        params = {"q": "test query"}
-        result = await make_coveo_request(params)
-        
-        # Verify result contains error
-        assert "error" in result
+    # Verify result contains error
+    assert result == {"error": "HTTP 400: Bad Request"}
 
 
-@pytest.mark.asyncio
-async def test_make_coveo_request_exception():
+async def test_make_coveo_request_exception(coveo_api):
     """Test Coveo API request with general exception."""
-    # Mock the AsyncClient to raise exception
-    mock_client = AsyncMock()
-    mock_client.post = AsyncMock(side_effect=Exception("Test exception"))
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=None)
+    coveo_api.post(SEARCH_PATH).mock(side_effect=Exception("Test exception"))
     
-    with patch('httpx.AsyncClient', return_value=mock_client):
-        # Call function
-        params = {"q": "test query"}
-        result = await make_coveo_request(params)
-        
-        # Verify result contains error
-        assert "error" in result
-        assert "Test exception" in result["error"]
+    # Call function
+    params = {"q": "test query"}
+    result = await make_coveo_request(params)
+    
+    # Verify result contains error
+    assert "error" in result
+    assert "Test exception" in result["error"]
 
 
-@pytest.mark.asyncio
-async def test_retrieve_passages_success():
+async def test_retrieve_passages_success(coveo_api):
     """Test successful retrieval of passages."""
-    # Setup mock response
-    mock_response = MagicMock()
-    mock_response.raise_for_status = MagicMock()
-    mock_response.json.return_value = {
+    body = orjson.dumps({
         "items": [
             {
                 "text": "This is a test passage",
@@ -147,168 +262,183 @@ async def test_retrieve_passages_success():
                     "clickableuri": "https://example.com/doc"
                 }
             }
-        ]
-    }
+        ],
+        "responseId": "test-response-id"
+    })
+    coveo_api.post(PASSAGES_PATH).mock(side_effect=lambda request: _streamed(body))
     
-    # Mock the AsyncClient as context manager
-    mock_client = AsyncMock()
-    mock_client.post = AsyncMock(return_value=mock_response)
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=None)
+    # Call function
+    result = await retrieve_passages("test query")
     
-    # Patch the global variables and the client
-    with patch('coveo_mcp_server.coveo_api.API_KEY', 'mock-api-key'), \
-         patch('coveo_mcp_server.coveo_api.ORG_ID', 'mock-org-id'), \
-         patch('httpx.AsyncClient', return_value=mock_client):
-        
-        # Call function
-        result = await retrieve_passages("test query")
-        
-        # Verify result
-        assert len(result) == 1
-        assert isinstance(result[0], dict)
-        assert result[0]["text"] == "This is a test passage"
-        assert result[0]["document"]["title"] == "Test Document"
-        assert result[0]["document"]["permanentid"] == "test-id"
-        assert result[0]["document"]["clickableuri"] == "https://example.com/doc"
+    # Verify result
+    assert len(result) == 1
+    assert isinstance(result[0], dict)
+    assert result[0]["text"] == "This is a test passage"
+    assert "relevanceScore" not in result[0]
+    assert result[0]["document"]["title"] == "Test Document"
+    assert result[0]["document"]["permanentid"] == "test-id"
+    assert result[0]["document"]["clickableuri"] == "https://example.com/doc"
+
+
+async def test_retrieve_passages_oauth_token(coveo_api):
+    """Test that only API keys send the organization in a header."""
+    route = coveo_api.post(PASSAGES_PATH).respond(json={"items": []})
+    
+    # API key: organization passed in a header
+    await retrieve_passages("test query")
+    assert route.calls.last.request.headers["organizationId"] == "mock-org-id"
+
+    # OAuth token: organization passed only in the URL
+    get_config.cache_clear()
+    with patch.dict(os.environ, {"COVEO_API_KEY": "x-mock-oauth-token"}):
+        await retrieve_passages("test query")
+    get_config.cache_clear()
+    assert "organizationId" not in route.calls.last.request.headers
+    assert route.calls.last.request.url.params["organizationId"] == "mock-org-id"
 
 
-@pytest.mark.asyncio
-async def test_retrieve_passages_http_error():
+async def test_retrieve_passages_http_error(coveo_api, caplog):
     """Test passage retrieval with HTTP error."""
-    # Setup mock response that raises HTTP error
-    mock_response = MagicMock()
-    mock_response.raise_for_status.side_effect = httpx.HTTPStatusError(
-        "HTTP Error", request=MagicMock(), response=MagicMock()
-    )
+    coveo_api.post(PASSAGES_PATH).mock(side_effect=lambda request: _streamed(b"Bad Request", status_code=400))
     
-    # Mock the AsyncClient as context manager
-    mock_client = AsyncMock()
-    mock_client.post = AsyncMock(return_value=mock_response)
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=None)
+    # Call function
+    result = await retrieve_passages("test query")
     
-    # Patch the global variables and the client
-    with patch('coveo_mcp_server.coveo_api.API_KEY', 'mock-api-key'), \
-         patch('coveo_mcp_server.coveo_api.ORG_ID', 'mock-org-id'), \
-         patch('httpx.AsyncClient', return_value=mock_client):
-        
-        # Call function
+    # Verify result is empty list on HTTP error
+    assert result == []
+    assert "HTTP 400: Bad Request" in caplog.text
+
+
+async def test_retrieve_passages_missing_credentials(caplog):
+    """Test that missing credentials are logged and return no passages."""
+    get_config.cache_clear()
+    with patch.dict(os.environ, clear=True):
         result = await retrieve_passages("test query")
-        
-        # Verify result is empty list on HTTP error
-        assert result == []
+
+    assert result == []
+    assert "COVEO_API_KEY" in caplog.text
 
 
-@pytest.mark.asyncio
-async def test_retrieve_passages_exception():
+async def test_retrieve_passages_exception(coveo_api):
     """Test passage retrieval with general exception."""
-    # Mock the AsyncClient to raise exception
-    mock_client = AsyncMock()
-    mock_client.post = AsyncMock(side_effect=Exception("Test exception"))
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=None)
+    coveo_api.post(PASSAGES_PATH).mock(side_effect=Exception("Test exception"))
     
-    # Patch the global variables and the client
-    with patch('coveo_mcp_server.coveo_api.API_KEY', 'mock-api-key'), \
-         patch('coveo_mcp_server.coveo_api.ORG_ID', 'mock-org-id'), \
-         patch('httpx.AsyncClient', return_value=mock_client):
-        
-        # Call function
-        result = await retrieve_passages("test query")
-        
-        # Verify result is empty list on exception
-        assert result == []
+    # Call function
+    result = await retrieve_passages("test query")
+    
+    # Verify result is empty list on exception
+    assert result == []
 
 
-@pytest.mark.asyncio
-async def test_generate_answer_success():
-    """Test successful answer generation."""
-    # Create a proper async context manager mock
+async def test_iter_sse_data():
+    """Test parsing of server-sent events split across chunks."""
     class MockStreamResponse:
-        async def __aenter__(self):
-            return self
-        
-        async def __aexit__(self, exc_type, exc_val, exc_tb):
-            return None
-        
-        def raise_for_status(self):
-            pass
-        
-        async def aiter_lines(self):
-            lines = [
-                'data:{"payloadType":"genqa.messageType","payload":"{\\"textDelta\\":\\"This is \\"}"}',
-                'data:{"payloadType":"genqa.messageType","payload":"{\\"textDelta\\":\\"a test answer\\"}"}',
-                'data:{"payloadType":"genqa.citationsType","payload":"{\\"citations\\":[{\\"title\\":\\"Citation Title\\",\\"clickUri\\":\\"https://example.com/citation\\"}]}"}',
-                'data:{"payloadType":"genqa.endOfStreamType"}'
-            ]
-            for line in lines:
-                yield line
+        async def aiter_bytes(self, chunk_size=None):
+            yield b': keep-alive comment\n\ndata: {"a"'
+            yield b': 1}\n\nevent: update\ndata: {"b": 2}\n'
+            yield b'\ndata: {"c": 3}\r\n\ndata: {"d": 4}'
+
+    events = [event async for event in iter_sse_data(MockStreamResponse())]
+
+    assert [json.loads(event) for event in events] == [{"a": 1}, {"b": 2}, {"c": 3}, {"d": 4}]
+
+
+async def test_iter_sse_data_crlf_and_cr_line_endings():
+    """Test that CRLF and CR framed streams are split into events as they arrive."""
+    class MockStreamResponse:
+        def __init__(self, body: bytes):
+            self.body = body
+
+        async def aiter_bytes(self, chunk_size=None):
+            # Split so that CRLF pairs straddle read boundaries
+            for i in range(0, len(self.body), 7):
+                yield self.body[i:i + 7]
+
+    for newline in (b"\r\n", b"\r"):
+        body = newline.join([
+            b': keep-alive comment', b'',
+            b'data: {"a": 1}', b'',
+            b'event: update', b'data: {"b":', b'data:  2}', b'',
+            b'data: {"c": 3}', b'', b''
+        ])
+        events = [event async for event in iter_sse_data(MockStreamResponse(body))]
+
+        assert [json.loads(event) for event in events] == [{"a": 1}, {"b": 2}, {"c": 3}]
+
+
+async def test_iter_sse_data_single_byte_reads():
+    """Test that events are found when every read carries a single byte."""
+    class MockStreamResponse:
+        def __init__(self, body: bytes):
+            self.body = body
+
+        async def aiter_bytes(self, chunk_size=None):
+            for i in range(len(self.body)):
+                yield self.body[i:i + 1]
+
+    for newline in (b"\n", b"\r\n", b"\r"):
+        body = newline.join([b'data: {"a": 1}', b'', b'data: {"b":', b'data: 2}', b'', b''])
+        events = [event async for event in iter_sse_data(MockStreamResponse(body))]
+
+        assert [json.loads(event) for event in events] == [{"a": 1}, {"b": 2}]
+
+
+async def test_generate_answer_crlf_stream(coveo_api):
+    """Test that a fully CRLF-framed answer stream is decoded."""
+    body = _ANSWER_SSE_BODY.replace(b"\n", b"\r\n")
+    coveo_api.post(ANSWER_PATH).mock(side_effect=lambda request: _streamed(body))
     
-    # Mock the AsyncClient as context manager
-    mock_client = AsyncMock()
-    mock_client.stream = MagicMock(return_value=MockStreamResponse())
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=None)
+    result = "".join([chunk async for chunk in generate_answer("test question")])
     
-    with patch('httpx.AsyncClient', return_value=mock_client):
-        # Call function
-        result = await generate_answer("test question")
-        
-        # Verify result
-        assert "This is a test answer" in result
-        assert "Citation Title" in result
-        assert "https://example.com/citation" in result
+    assert result.startswith("This is a test answer\n\n**Sources:**")
+
 
+async def test_generate_answer_success(coveo_api):
+    """Test successful answer generation."""
+    coveo_api.post(ANSWER_PATH).mock(side_effect=lambda request: _streamed(_ANSWER_SSE_BODY))
+    
+    # Call function
+    result = "".join([chunk async for chunk in generate_answer("test question")])
+    
+    # Verify result
+    assert "This is a test answer" in result
+    assert "Citation Title" in result
+    assert "https://example.com/citation" in result
+    assert result == (
+        "This is a test answer"
+        "\n\n**Sources:**\n"
+        "1. [Citation Title](https://example.com/citation)\n"
+    )
 
-@pytest.mark.asyncio
-async def test_generate_answer_http_error():
+
+async def test_generate_answer_http_error(coveo_api):
     """Test answer generation with HTTP error."""
-    # Create a proper async context manager mock that raises HTTPStatusError
-    class MockStreamResponse:
-        async def __aenter__(self):
-            return self
-        
-        async def __aexit__(self, exc_type, exc_val, exc_tb):
-            return None
-        
-        def raise_for_status(self):
-            response_mock = MagicMock()
-            response_mock.status_code = 400
-            response_mock.text = "Bad Request"
-            raise httpx.HTTPStatusError(
-                "HTTP Error", request=MagicMock(), response=response_mock
-            )
-        
-        async def aiter_lines(self):
-            # This should not be reached since raise_for_status should raise
-            return []
+    coveo_api.post(ANSWER_PATH).mock(side_effect=lambda request: _streamed(b"Bad Request", status_code=400))
     
-    mock_client = AsyncMock()
-    mock_client.stream = MagicMock(return_value=MockStreamResponse())
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=None)
+    # Call function
+    result = "".join([chunk async for chunk in generate_answer("test question")])
     
-    with patch('httpx.AsyncClient', return_value=mock_client):
-        # Call function
-        result = await generate_answer("test question")
-        
-        # Verify result contains error
-        assert "Error: HTTP 400" in result
+    # Verify result contains error
+    assert result == "Error: HTTP 400: Bad Request"
 
 
-@pytest.mark.asyncio
-async def test_generate_answer_exception():
+async def test_generate_answer_exception(coveo_api):
     """Test answer generation with general exception."""
-    # Mock the AsyncClient to raise exception during stream call
-    mock_client = AsyncMock()
-    mock_client.stream = MagicMock(side_effect=Exception("Test exception"))
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=None)
+    coveo_api.post(ANSWER_PATH).mock(side_effect=Exception("Test exception"))
     
-    with patch('httpx.AsyncClient', return_value=mock_client):
-        # Call function
-        result = await generate_answer("test question")
-        
-        # Verify result contains error
-        assert "Error generating answer: Test exception" in result
\ No newline at end of file
+    # Call function
+    result = "".join([chunk async for chunk in generate_answer("test question")])
+    
+    # Verify result contains error
+    assert "Error generating answer: Test exception" in result
+
+
+async def test_generate_answer_blank_query():
+    """Test that blank queries are rejected before the configuration is read."""
+    with patch('coveo_mcp_server.coveo_api.get_config') as mock_get_config, \
+         patch('coveo_mcp_server.coveo_api.get_client') as mock_get_client:
+        result = "".join([chunk async for chunk in generate_answer("   ")])
+    
+    assert result == "Error: Query cannot be empty"
+    mock_get_config.assert_not_called()
+    mock_get_client.assert_not_called()
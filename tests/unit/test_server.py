@@ -1,10 +1,15 @@
-import unittest
 from unittest.mock import patch, AsyncMock, MagicMock
+import itertools
 import os
 
+import orjson
 import pytest
+from cachetools import TTLCache
+from mcp.shared.memory import create_connected_server_and_client_session
 
+from coveo_mcp_server import server
 from coveo_mcp_server.server import (
+    mcp,
     search_coveo,
     passage_retrieval,
     answer_question
@@ -12,17 +17,13 @@ from coveo_mcp_server.server import (
 
 
 @pytest.fixture(autouse=True)
-def mock_env_vars():
-    """Fixture to mock environment variables for all tests."""
-    with patch.dict(os.environ, {
-        "COVEO_API_KEY": "mock-api-key",
-        "COVEO_ORGANIZATION_ID": "mock-org-id",
-        "COVEO_ANSWER_CONFIG_ID": "mock-config-id"
-    }):
-        yield
+def clear_caches():
+    """Fixture to start every test with empty result caches."""
+    server._search_cache.clear()
+    server._passage_cache.clear()
+    yield
 
 
-@pytest.mark.asyncio
 async def test_search_coveo_success():
     """Test successful search."""
     # Setup mock response
@@ -48,9 +49,10 @@ async def test_search_coveo_success():
         call_args = mock_make_request.call_args.args[0]
         assert call_args["q"] == "test query"
         assert call_args["numberOfResults"] == 5
+        assert call_args["fieldsToInclude"] == ["title", "uri", "excerpt", "printableUri", "clickUri"]
+        assert "q" not in server._SEARCH_PAYLOAD_BASE
 
 
-@pytest.mark.asyncio
 async def test_search_coveo_empty_results():
     """Test search with empty results."""
     # Setup mock response
@@ -65,7 +67,6 @@ async def test_search_coveo_empty_results():
         assert result == "No results found for this query."
 
 
-@pytest.mark.asyncio
 async def test_search_coveo_error():
     """Test search with error."""
     # Setup mock response
@@ -81,7 +82,67 @@ async def test_search_coveo_error():
         assert "API error" in result
 
 
-@pytest.mark.asyncio
+async def test_search_coveo_cached():
+    """Test that repeated searches are served from the cache."""
+    mock_make_request = AsyncMock()
+    mock_make_request.return_value = {"results": [{"title": "Test Document"}]}
+    
+    with patch('coveo_mcp_server.server.make_coveo_request', mock_make_request):
+        first = await search_coveo("test query", numberOfResults=5)
+        second = await search_coveo("test query", numberOfResults=5)
+        await search_coveo("test query", numberOfResults=10)
+
+        # Verify only distinct arguments reach the API
+        assert first == second
+        assert mock_make_request.call_count == 2
+
+
+async def test_search_coveo_errors_not_cached():
+    """Test that failed searches are retried instead of cached."""
+    mock_make_request = AsyncMock()
+    mock_make_request.side_effect = [
+        {"error": "API error"},
+        {"results": [{"title": "Test Document"}]}
+    ]
+    
+    with patch('coveo_mcp_server.server.make_coveo_request', mock_make_request):
+        assert "Error:" in await search_coveo("test query")
+        assert "Test Document" in await search_coveo("test query")
+
+
+async def test_cache_entry_expiring_during_lookup():
+    """Test that entries expiring while they are looked up are refetched instead of raising."""
+    # Each cache operation advances the clock, so an entry alive when checked expires before a second read
+    search_ticks = itertools.count()
+    passage_ticks = itertools.count()
+    search_cache = TTLCache(maxsize=256, ttl=2, timer=lambda: next(search_ticks))
+    passage_cache = TTLCache(maxsize=256, ttl=2, timer=lambda: next(passage_ticks))
+    search_cache[("test query", 5)] = "cached results"
+    passage_cache[("test query", 5)] = "cached passages"
+    
+    with patch('coveo_mcp_server.server._search_cache', search_cache), \
+         patch('coveo_mcp_server.server._passage_cache', passage_cache), \
+         patch('coveo_mcp_server.server.make_coveo_request', AsyncMock(return_value={"results": [{"title": "Fresh"}]})), \
+         patch('coveo_mcp_server.server.retrieve_passages', AsyncMock(return_value=[{"text": "Fresh", "document": {}}])):
+        assert await search_coveo("test query") == "cached results"
+        assert await passage_retrieval("test query") == "cached passages"
+        assert "Fresh" in await search_coveo("test query")
+        assert "Fresh" in await passage_retrieval("test query")
+
+
+async def test_cache_disabled():
+    """Test that COVEO_DISABLE_CACHE=1 bypasses the cache."""
+    mock_retrieve_passages = AsyncMock()
+    mock_retrieve_passages.return_value = [{"text": "This is a test passage", "document": {}}]
+    
+    with patch('coveo_mcp_server.server.retrieve_passages', mock_retrieve_passages), \
+         patch.dict(os.environ, {"COVEO_DISABLE_CACHE": "1"}):
+        await passage_retrieval("test query")
+        await passage_retrieval("test query")
+
+        assert mock_retrieve_passages.call_count == 2
+
+
 async def test_passage_retrieval_success():
     """Test successful passage retrieval."""
     # Create mock passages as dictionaries (not MagicMock objects)
@@ -111,7 +172,6 @@ async def test_passage_retrieval_success():
         mock_retrieve_passages.assert_called_once_with(query="test query", number_of_passages=5)
 
 
-@pytest.mark.asyncio
 async def test_passage_retrieval_empty():
     """Test passage retrieval with no results."""
     # Setup mock to return empty list
@@ -126,7 +186,6 @@ async def test_passage_retrieval_empty():
         assert result == "No passages found for this query."
 
 
-@pytest.mark.asyncio
 async def test_passage_retrieval_exception():
     """Test passage retrieval with exception."""
     # Setup mock to raise exception
@@ -142,38 +201,44 @@ async def test_passage_retrieval_exception():
         assert "Test exception" in result
 
 
-@pytest.mark.asyncio
 async def test_answer_question_success():
     """Test successful answer generation."""
-    # Setup mock response
-    mock_generate_answer = AsyncMock()
-    mock_generate_answer.return_value = "This is the answer."
+    # Setup mock answer stream
+    async def mock_answer_stream(query):
+        yield "This is "
+        yield "the answer."
+
+    mock_generate_answer = MagicMock(side_effect=mock_answer_stream)
+    mock_ctx = MagicMock()
+    mock_ctx.report_progress = AsyncMock()
     
     with patch('coveo_mcp_server.server.generate_answer', mock_generate_answer):
         # Call function
-        result = await answer_question("test question")
+        result = await answer_question("test question", mock_ctx)
 
         # Verify result
         assert result == "This is the answer."
         mock_generate_answer.assert_called_once_with("test question")
 
+        # Verify each chunk was streamed to the client
+        messages = [call.kwargs["message"] for call in mock_ctx.report_progress.call_args_list]
+        assert messages == ["This is ", "the answer."]
+
 
-@pytest.mark.asyncio
 async def test_answer_question_exception():
     """Test answer generation with exception."""
     # Setup mock to raise exception
-    mock_generate_answer = AsyncMock()
+    mock_generate_answer = MagicMock()
     mock_generate_answer.side_effect = Exception("Test exception")
     
     with patch('coveo_mcp_server.server.generate_answer', mock_generate_answer):
         # Call function
-        result = await answer_question("test question")
+        result = await answer_question("test question", MagicMock())
 
         # Verify result
         assert "Error generating answer:" in result
         assert "Test exception" in result
 
-@pytest.mark.asyncio
 async def test_empty_queries():
     """Test all tools with empty queries."""
     # Test passage_retrieval with empty query
@@ -181,5 +246,55 @@ async def test_empty_queries():
     assert result == "Error: Query cannot be empty"
 
     # Test answer_question with empty query
-    result = await answer_question("")
-    assert result == "Error: Query cannot be empty"
\ No newline at end of file
+    result = await answer_question("", MagicMock())
+    assert result == "Error: Query cannot be empty"
+
+    # Whitespace-only queries are rejected before any Coveo call
+    with patch('coveo_mcp_server.server.retrieve_passages', AsyncMock()) as mock_retrieve, \
+         patch('coveo_mcp_server.server.generate_answer') as mock_generate:
+        assert await passage_retrieval("   ") == "Error: Query cannot be empty"
+        assert await answer_question("\n\t", MagicMock()) == "Error: Query cannot be empty"
+        mock_retrieve.assert_not_called()
+        mock_generate.assert_not_called()
+
+
+async def test_tools_through_mcp_session():
+    """Test the tools end to end through an MCP client session, as clients call them."""
+    async def mock_answer_stream(query):
+        yield "This is "
+        yield "the answer."
+
+    progress_messages = []
+    async def on_progress(progress, total, message):
+        progress_messages.append(message)
+
+    with patch('coveo_mcp_server.server.make_coveo_request', AsyncMock(return_value={"results": [{"title": "Test Document"}]})), \
+         patch('coveo_mcp_server.server.retrieve_passages', AsyncMock(return_value=[{"text": "A passage", "document": {}}])), \
+         patch('coveo_mcp_server.server.generate_answer', MagicMock(side_effect=mock_answer_stream)):
+        async with create_connected_server_and_client_session(mcp) as session:
+            search = await session.call_tool("search_coveo", {"query": "test query"})
+            passages = await session.call_tool("passage_retrieval", {"query": "test query"})
+            answer = await session.call_tool("answer_question", {"query": "test question"}, progress_callback=on_progress)
+
+    # Tool results must pass FastMCP's output validation
+    assert not search.isError
+    assert orjson.loads(search.content[0].text) == [{"title": "Test Document"}]
+    assert not passages.isError
+    assert orjson.loads(passages.content[0].text) == [{"text": "A passage", "document": {}}]
+
+    # The Context is injected by FastMCP, and each chunk is streamed as a progress notification
+    assert not answer.isError
+    assert answer.content[0].text == "This is the answer."
+    assert progress_messages == ["This is ", "the answer."]
+
+
+async def test_lifespan_closes_client_after_last_session():
+    """Test that the shared Coveo client is closed only when the last MCP session ends."""
+    with patch('coveo_mcp_server.server.aclose_client', AsyncMock()) as mock_aclose_client:
+        async with create_connected_server_and_client_session(mcp):
+            async with create_connected_server_and_client_session(mcp):
+                pass
+            # Another session is still running and may be using the client
+            mock_aclose_client.assert_not_called()
+
+        mock_aclose_client.assert_awaited_once()
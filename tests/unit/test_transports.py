@@ -0,0 +1,52 @@
+import httpx
+
+from coveo_mcp_server.server import mcp
+
+
+BASE_URL = "http://127.0.0.1:8000"
+
+
+async def test_streamable_http_transport():
+    """Test that the streamable-http app answers an MCP initialize request."""
+    app = mcp.streamable_http_app()
+    initialize_request = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "initialize",
+        "params": {
+            "protocolVersion": "2025-03-26",
+            "capabilities": {},
+            "clientInfo": {"name": "test-client", "version": "1.0"}
+        }
+    }
+
+    # The ASGI transport does not run the app lifespan, so start the session manager here
+    async with mcp.session_manager.run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url=BASE_URL) as client:
+            response = await client.post(
+                "/mcp",
+                json=initialize_request,
+                headers={"Accept": "application/json, text/event-stream"}
+            )
+
+    assert response.status_code == 200
+    assert '"name":"coveo_mcp_server"' in response.text
+
+
+async def test_sse_transport():
+    """Test that the SSE app exposes its stream and message endpoints."""
+    app = mcp.sse_app()
+    paths = [route.path for route in app.routes]
+    assert "/sse" in paths
+    assert "/messages" in paths
+
+    # The message endpoint rejects requests that are not tied to an SSE session
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url=BASE_URL) as client:
+        response = await client.post("/messages/", json={})
+
+    assert response.status_code == 400
+
+
+def test_stdio_transport():
+    """Test that the server can be started on the stdio transport."""
+    assert callable(mcp.run_stdio_async)